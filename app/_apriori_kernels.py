@@ -0,0 +1,60 @@
+# app/_apriori_kernels.py
+
+import numpy as np
+
+# NumPy >= 2.0 has a native popcount ufunc that maps to POPCNT/VPOPCNTDQ
+_HAS_BITWISE_COUNT = hasattr(np, 'bitwise_count')
+
+# Number of set bits for every byte value; popcount fallback for older NumPy
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# Candidates ANDed per batch; keeps the temporary bitmaps within a few MB
+CHUNK_SIZE = 4096
+
+def popcount_rows(bitmaps):
+    """
+    Count the set bits of every row of a packed bitmap array
+    
+    Parameters:
+    -----------
+    bitmaps : numpy.ndarray
+        uint64 array of shape (n_rows, n_words)
+    
+    Returns:
+    --------
+    numpy.ndarray
+        int64 array of per-row bit counts
+    """
+    if _HAS_BITWISE_COUNT:
+        return np.bitwise_count(bitmaps).sum(axis=1, dtype=np.int64)
+    
+    as_bytes = np.ascontiguousarray(bitmaps).view(np.uint8)
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=1, dtype=np.int64)
+
+def count_supports(bitmaps, cand_rows, cand_cols, out=None):
+    """
+    Count the transactions shared by each pair of bitmap rows
+    
+    Parameters:
+    -----------
+    bitmaps : numpy.ndarray
+        uint64 array of shape (n_rows, n_words)
+    cand_rows, cand_cols : numpy.ndarray
+        Row indices of the two parents of every candidate
+    out : numpy.ndarray, optional
+        int64 array receiving the counts
+    
+    Returns:
+    --------
+    numpy.ndarray
+        popcount(bitmaps[cand_rows[k]] & bitmaps[cand_cols[k]]) for every k
+    """
+    if out is None:
+        out = np.empty(len(cand_rows), dtype=np.int64)
+    
+    for start in range(0, len(cand_rows), CHUNK_SIZE):
+        stop = start + CHUNK_SIZE
+        acc = bitmaps[cand_rows[start:stop]] & bitmaps[cand_cols[start:stop]]
+        out[start:stop] = popcount_rows(acc)
+    
+    return out
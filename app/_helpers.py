@@ -0,0 +1,422 @@
+# app/_helpers.py
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from apriori_analysis import run_apriori
+import pyarrow as pa
+import io
+import math
+import os
+import tempfile
+
+
+def read_transactions_csv(source) -> pd.DataFrame:
+    """
+    Parse a transactions CSV with typed columns
+    
+    The PyArrow engine parses multi-threaded and the columns arrive typed:
+    dates are parsed on load so nothing downstream re-parses strings.
+    Member IDs are left to type inference so alphanumeric IDs still load.
+    """
+    return pd.read_csv(
+        source,
+        engine="pyarrow",
+        parse_dates=["Date"],
+        date_format="%d-%m-%Y",
+        dtype={"itemDescription": "category"}
+    )
+
+
+def load_bundled_dataset(path: str) -> pd.DataFrame:
+    """
+    Load a bundled CSV through a Parquet copy written next to it on first load
+    
+    Parquet keeps the parsed dtypes, so later cold starts skip CSV parsing
+    entirely. The copy is refreshed whenever the CSV is newer.
+    """
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(path):
+        try:
+            return pd.read_parquet(parquet_path)
+        except (pa.ArrowInvalid, OSError):
+            # Unreadable copy: fall back to the CSV and rewrite it below
+            pass
+    
+    df = read_transactions_csv(path)
+    tmp_path = None
+    try:
+        # Write to a temp file in the same directory and rename it into
+        # place, so concurrent readers never see a partially written copy
+        fd, tmp_path = tempfile.mkstemp(suffix=".parquet.tmp",
+                                        dir=os.path.dirname(parquet_path) or ".")
+        os.close(fd)
+        df.to_parquet(tmp_path, compression="zstd")
+        os.replace(tmp_path, parquet_path)
+    except OSError:
+        # Read-only deployments simply keep parsing the CSV
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+
+# Process-wide caches below are bounded so distinct uploads and parameter
+# combinations don't accumulate for the life of the server
+@st.cache_resource(show_spinner=False, max_entries=8, ttl="1h")
+def parsed_arrow_bytes(source) -> bytes:
+    """
+    Parse a dataset once and keep the result as an Arrow IPC (Feather) buffer
+    
+    The source is either a bundled file path (cheap to hash) or the raw
+    bytes of an upload.
+    """
+    if isinstance(source, bytes):
+        df = read_transactions_csv(io.BytesIO(source))
+    else:
+        df = load_bundled_dataset(source)
+    
+    # Numeric member IDs usually fit a much smaller unsigned type (uint16 for
+    # the bundled datasets), which shrinks every downstream groupby
+    if pd.api.types.is_numeric_dtype(df['Member_number']):
+        df['Member_number'] = pd.to_numeric(df['Member_number'], downcast='unsigned')
+    
+    buf = io.BytesIO()
+    df.to_feather(buf)
+    return buf.getvalue()
+
+
+def load_data(source) -> pd.DataFrame:
+    """
+    Load a CSV file path or upload as a DataFrame from its cached Feather buffer
+    
+    Reading Arrow IPC is zero-copy for the numeric columns, which is cheaper
+    than unpickling a cached DataFrame on every rerun.
+    """
+    return pd.read_feather(io.BytesIO(parsed_arrow_bytes(source)))
+
+
+@st.cache_data(max_entries=8, ttl="1h")
+def compute_basic_stats(dataset_id: str, _df: pd.DataFrame) -> dict:
+    """
+    Compute the store overview statistics once per dataset
+    
+    Parameters:
+    -----------
+    dataset_id : str
+        Cache key identifying the dataset (file path or upload hash)
+    _df : pandas.DataFrame
+        Raw transaction data, excluded from hashing
+        
+    Returns:
+    --------
+    dict
+        Dictionary containing the overview statistics
+    """
+    purchases_per_customer = _df.groupby('Member_number', sort=False, observed=True).size()
+    quartiles = purchases_per_customer.quantile([0.25, 0.75])
+    return {
+        'total_purchases': len(_df),
+        'n_customers': _df['Member_number'].nunique(),
+        'n_products': _df['itemDescription'].nunique(),
+        'date_min': _df['Date'].min(),
+        'date_max': _df['Date'].max(),
+        'purchases_per_customer': purchases_per_customer,
+        'purchases_summary': {
+            'mean': purchases_per_customer.mean(),
+            'max': int(purchases_per_customer.max()),
+            'q25': int(quartiles.loc[0.25]),
+            'q75': int(quartiles.loc[0.75])
+        },
+        'daily_transactions': _df.groupby('Date', sort=True, observed=True).size().rename('Transactions').reset_index()
+    }
+
+
+@st.cache_data(max_entries=32, ttl="1h")
+def to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serialize a DataFrame to in-memory CSV bytes for st.download_button
+    """
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False)
+    return buf.getvalue()
+
+
+@st.cache_data(max_entries=16, ttl="1h")
+def rules_to_csv_bytes(rules: pd.DataFrame) -> bytes:
+    """
+    Serialize the rules to CSV bytes with vectorized string concatenation
+    
+    The itemset strings are always quoted, so each row is assembled column
+    by column instead of going through the generic per-row CSV writer.
+    """
+    header = 'antecedents,consequents,support,confidence,lift'
+    if rules.empty:
+        return (header + '\n').encode('utf-8')
+    
+    def quote(col):
+        return '"' + col.astype(str).str.replace('"', '""', regex=False) + '"'
+    
+    lines = (quote(rules['antecedents_str']) + ',' + quote(rules['consequents_str']) +
+             ',' + rules['support'].astype(str) +
+             ',' + rules['confidence'].astype(str) +
+             ',' + rules['lift'].astype(str))
+    return ('\n'.join([header, *lines]) + '\n').encode('utf-8')
+
+
+def split_stats_for_export(stats):
+    """
+    Split the transaction statistics into one table per structure
+    
+    Parameters:
+    -----------
+    stats : dict
+        Transaction statistics returned by run_apriori
+        
+    Returns:
+    --------
+    tuple
+        (summary, most_common_items, transaction_by_date) DataFrames
+    """
+    summary = pd.Series({
+        'total_transactions': stats['total_transactions'],
+        'total_items': stats['total_items'],
+        'avg_items_per_transaction': stats['avg_items_per_transaction']
+    }, name='value', dtype=object).rename_axis('statistic').reset_index()
+    most_common_items = stats['most_common_items'].rename('count').rename_axis('item').reset_index()
+    transaction_by_date = stats['transaction_by_date'].rename('transactions').rename_axis('date').reset_index()
+    return summary, most_common_items, transaction_by_date
+
+
+@st.cache_data(show_spinner=False, max_entries=16, ttl="1h")
+def cached_apriori(dataset_id: str, min_support: float, min_confidence: float, _data: pd.DataFrame):
+    """
+    Run Apriori once per (dataset, min_support, min_confidence) combination
+    
+    The DataFrame itself is excluded from hashing (leading underscore); the
+    dataset id (file path or upload hash) identifies it instead.
+    """
+    return run_apriori(_data, min_support, min_confidence)
+
+
+def build_purchases_histogram(purchases_per_customer, average):
+    """
+    Build the "How Often Do Customers Shop?" histogram
+    
+    Parameters:
+    -----------
+    purchases_per_customer : pandas.Series
+        Number of purchases per customer
+    average : float
+        Average number of purchases, marked with a vertical line
+        
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+        Pre-binned bar chart with a marker at the average
+    """
+    # Bin the counts server-side so only the bar heights are sent to the
+    # browser. The data are integers, so use at most 30 whole-number-wide
+    # bins centred on the integers; fractional widths would merge some
+    # neighbouring counts and draw false spikes.
+    values = purchases_per_customer.to_numpy()
+    low, high = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+    width = max(1, math.ceil((high - low + 1) / 30))
+    counts, edges = np.histogram(values, bins=np.arange(low, high + width + 1, width) - 0.5)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=edges[1:] - edges[:-1],
+        marker_color='#1f77b4'
+    ))
+    
+    # Update layout for better readability
+    fig.update_layout(
+        title='How Often Do Customers Shop?',
+        bargap=0,
+        plot_bgcolor='white',
+        xaxis_title="Number of Times a Customer Shops",
+        yaxis_title="Number of Customers",
+        showlegend=False,
+        title_x=0.5,
+        title_font_size=20
+    )
+    
+    # Add a vertical line for the average
+    fig.add_vline(
+        x=average,
+        line_dash="dash",
+        line_color="red",
+        annotation_text="Average",
+        annotation_position="top right"
+    )
+    
+    return fig
+
+
+def build_daily_chart(daily_transactions):
+    """
+    Build the "Daily Shopping Activity" line chart
+    
+    Parameters:
+    -----------
+    daily_transactions : pandas.DataFrame
+        Date and Transactions columns in chronological order
+        
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+        Line chart of items sold per day
+    """
+    # Create a line chart for daily transactions
+    fig = px.line(
+        daily_transactions,
+        x='Date',
+        y='Transactions',
+        title='Daily Shopping Activity',
+        labels={'Transactions': 'Number of Items Sold', 'Date': 'Date'},
+        color_discrete_sequence=['#1f77b4']
+    )
+    
+    # Update layout
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis_title="Date",
+        yaxis_title="Number of Items Sold",
+        showlegend=False,
+        title_x=0.5,
+        title_font_size=20,
+        font=dict(
+            family="Arial",
+            size=12,
+            color="#2c3e50"
+        )
+    )
+    
+    # Update axes for better visibility
+    fig.update_xaxes(
+        gridcolor='rgba(128, 128, 128, 0.2)',
+        zerolinecolor='rgba(128, 128, 128, 0.2)',
+        tickfont=dict(color="#2c3e50")
+    )
+    fig.update_yaxes(
+        gridcolor='rgba(128, 128, 128, 0.2)',
+        zerolinecolor='rgba(128, 128, 128, 0.2)',
+        tickfont=dict(color="#2c3e50")
+    )
+    
+    return fig
+
+
+def render_rule_card(position, rule):
+    """
+    Render one "Top Relationships" card as an HTML string
+    
+    Parameters:
+    -----------
+    position : int
+        1-based rank of the rule
+    rule : namedtuple
+        Row of the rules DataFrame as produced by itertuples()
+        
+    Returns:
+    --------
+    str
+        HTML for the card
+    """
+    return f"""
+<div style='background-color: rgba(240, 242, 246, 0.8); padding: 20px; border-radius: 10px; margin: 10px 0;'>
+    <h4 style='color: #1f77b4; margin-bottom: 10px;'>Relationship {position}</h4>
+    <p style='font-size: 16px; color: inherit;'>
+        When customers buy <strong>{rule.antecedents_str}</strong>,<br>
+        they often also buy <strong>{rule.consequents_str}</strong>
+    </p>
+    <div style='display: flex; justify-content: space-between; margin-top: 10px;'>
+        <div style='text-align: center; flex: 1;'>
+            <p style='font-size: 14px; color: inherit;'>How Common</p>
+            <p style='font-size: 18px; color: #2e7d32;'>{rule.support:.1%}</p>
+        </div>
+        <div style='text-align: center; flex: 1;'>
+            <p style='font-size: 14px; color: inherit;'>How Reliable</p>
+            <p style='font-size: 18px; color: #1f77b4;'>{rule.confidence:.1%}</p>
+        </div>
+        <div style='text-align: center; flex: 1;'>
+            <p style='font-size: 14px; color: inherit;'>Strength</p>
+            <p style='font-size: 18px; color: #e65100;'>{rule.lift:.1f}x</p>
+        </div>
+    </div>
+</div>
+"""
+
+
+def build_top_rules_plot(top_rules):
+    """
+    Build the support/confidence scatter of the top rules, sized by lift
+    
+    Parameters:
+    -----------
+    top_rules : pandas.DataFrame
+        Top rules with display strings and metrics
+        
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+        Scatter plot of the rules
+    """
+    fig = px.scatter(
+        top_rules,
+        x='support',
+        y='confidence',
+        size='lift',
+        # Let Plotly format the hover labels from the columns client-side
+        hover_data={
+            'antecedents_str': True,
+            'consequents_str': True,
+            'support': ':.3f',
+            'confidence': ':.3f',
+            'lift': ':.3f'
+        },
+        labels={
+            'antecedents_str': 'If bought',
+            'consequents_str': 'Then bought',
+            'support': 'Support',
+            'confidence': 'Confidence',
+            'lift': 'Lift'
+        },
+        title='Top 10 Rules by Lift'
+    )
+    
+    # Update layout
+    fig.update_layout(
+        xaxis_title="Support",
+        yaxis_title="Confidence",
+        hovermode='closest'
+    )
+    
+    return fig
+
+
+@st.cache_resource(show_spinner=False, max_entries=8, ttl="1h")
+def cached_overview_figures(dataset_id: str, _overview: dict):
+    """
+    Build the overview charts once per dataset and reuse them on every rerun
+    
+    Returns:
+    --------
+    tuple
+        (purchases histogram, daily activity chart)
+    """
+    return (
+        build_purchases_histogram(_overview['purchases_per_customer'], _overview['purchases_summary']['mean']),
+        build_daily_chart(_overview['daily_transactions'])
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=16, ttl="1h")
+def cached_top_rules_plot(analysis_key: tuple, _top_rules: pd.DataFrame):
+    """
+    Build the top-rules scatter once per (dataset, min_support, min_confidence)
+    """
+    return build_top_rules_plot(_top_rules)
@@ -1,8 +1,12 @@
 import pandas as pd
 import numpy as np
-from mlxtend.frequent_patterns import apriori
-from mlxtend.frequent_patterns import association_rules
+import scipy.sparse as sp
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+import threading
+from itertools import combinations
+from _apriori_kernels import count_supports, popcount_rows
 
 def preprocess_data(data):
     """
@@ -18,18 +22,42 @@ def preprocess_data(data):
     pandas.DataFrame
         Preprocessed data
     """
-    # Convert date to datetime with correct format
-    data['Date'] = pd.to_datetime(data['Date'], format='%d-%m-%Y', dayfirst=True)
+    # Convert date to datetime with correct format, parsing each distinct
+    # date string once
+    dates = pd.to_datetime(data['Date'], format='%d-%m-%Y', cache=True)
     
-    # Clean item descriptions
-    data['itemDescription'] = data['itemDescription'].str.strip().str.lower()
+    # Clean item descriptions on the (small) category array only, merging
+    # raw spellings that collapse onto the same cleaned name. The labels go
+    # through Arrow strings so strip/lower run as Arrow compute kernels.
+    items = data['itemDescription'].astype('category')
+    labels = items.cat.categories.astype('string[pyarrow]').str.strip().str.lower()
+    cleaned_codes, cleaned = pd.factorize(labels, sort=True)
+    cleaned = cleaned.astype(items.cat.categories.dtype)
     
-    # Remove duplicates
-    data = data.drop_duplicates()
+    # Remap the row codes; the appended -1 keeps missing values missing
+    item_codes = np.append(cleaned_codes, -1)[items.cat.codes.to_numpy()]
+    items = pd.Categorical.from_codes(item_codes, cleaned)
+    
+    # Build a new frame so the caller's data is left untouched
+    data = data.assign(Date=dates, itemDescription=items)
     
     # Remove rows with missing values
     data = data.dropna()
     
+    # Remove duplicates on (member, date, item code) integer keys rather than
+    # hashing Timestamps and strings; keep first occurrences in order.
+    # Members are factorized so non-numeric IDs work too.
+    keys = np.column_stack([
+        pd.factorize(data['Member_number'])[0].astype(np.int64),
+        data['Date'].to_numpy().view(np.int64),
+        data['itemDescription'].cat.codes.to_numpy(dtype=np.int64)
+    ])
+    _, first = np.unique(keys, axis=0, return_index=True)
+    data = data.iloc[np.sort(first)]
+    
+    # Drop categories whose only rows were removed above
+    data = data.assign(itemDescription=data['itemDescription'].cat.remove_unused_categories())
+    
     return data
 
 def analyze_transactions(data):
@@ -46,33 +74,325 @@ def analyze_transactions(data):
     dict
         Dictionary containing various transaction statistics
     """
+    # One grouping by member gives both the basket count and basket sizes
+    items_per_member = data.groupby('Member_number', sort=False).size()
+    
+    # Item frequencies straight from the category codes, no string hashing
+    categories = data['itemDescription'].cat.categories
+    item_counts = np.bincount(data['itemDescription'].cat.codes.to_numpy(), minlength=len(categories))
+    
+    # Top 10 items by count among those actually bought; ties keep
+    # category order
+    present = np.flatnonzero(item_counts)
+    n_top = min(10, len(present))
+    top = present[np.argpartition(-item_counts[present], n_top - 1)[:n_top]] if n_top else present
+    top = top[np.lexsort((top, -item_counts[top]))]
+    most_common_items = pd.Series(item_counts[top],
+                                  index=pd.Index(categories[top], name='itemDescription'),
+                                  name='count')
+    
     stats = {
-        'total_transactions': data['Member_number'].nunique(),
-        'total_items': data['itemDescription'].nunique(),
-        'avg_items_per_transaction': data.groupby('Member_number')['itemDescription'].count().mean(),
-        'most_common_items': data['itemDescription'].value_counts().head(10).to_dict(),
-        'transaction_by_date': data.groupby(data['Date'].dt.date)['Member_number'].nunique().to_dict()
+        'total_transactions': len(items_per_member),
+        'total_items': int(np.count_nonzero(item_counts)),
+        'avg_items_per_transaction': items_per_member.mean(),
+        'most_common_items': most_common_items,
+        'transaction_by_date': _members_per_day(data)
     }
     return stats
 
-def run_apriori(data, min_support, min_confidence):
+def _members_per_day(data):
     """
-    Run Apriori algorithm on the transaction data
+    Count the distinct members shopping on each day
+    
+    Unique (day, member) code pairs are packed into one int64 each, so the
+    count is a np.unique plus a bincount instead of a groupby nunique.
+    """
+    day_codes, days = pd.factorize(data['Date'].dt.normalize(), sort=True)
+    member_codes, _ = pd.factorize(data['Member_number'])
+    
+    pairs = np.unique((day_codes.astype(np.int64) << 32) | member_codes.astype(np.int64))
+    counts = np.bincount(pairs >> 32, minlength=len(days))
+    
+    return pd.Series(counts, index=pd.DatetimeIndex(days, name='Date'), name='Member_number')
+
+def build_basket_matrix(data):
+    """
+    Build the one-hot basket matrix from integer-coded transactions
     
     Parameters:
     -----------
     data : pandas.DataFrame
-        Transaction data where each row represents a transaction
+        Preprocessed transaction data
+        
+    Returns:
+    --------
+    pandas.DataFrame
+        Sparse boolean matrix with one row per member and one column per item
+    """
+    # Factorize both keys to integer codes (free for the categorical items)
+    member_codes, members = pd.factorize(data['Member_number'], sort=True)
+    item_codes, items = pd.factorize(data['itemDescription'], sort=True)
+    
+    # Store only the purchased (member, item) pairs: baskets are mostly empty
+    matrix = sp.csr_matrix((np.ones(len(data), dtype=bool), (member_codes, item_codes)),
+                           shape=(len(members), len(items)))
+    
+    return pd.DataFrame.sparse.from_spmatrix(matrix,
+                                             index=pd.Index(members, name='Member_number'),
+                                             columns=pd.Index(items, name='itemDescription'))
+
+def build_tid_bitmaps(binary_data):
+    """
+    Convert the basket matrix into vertical transaction-id bitmaps
+    
+    Parameters:
+    -----------
+    binary_data : pandas.DataFrame
+        Boolean basket matrix (transactions x items)
+        
+    Returns:
+    --------
+    numpy.ndarray
+        uint64 array of shape (n_items, ceil(n_transactions / 64)) where bit t
+        of row i is set when transaction t contains item i
+    """
+    n_transactions, n_items = binary_data.shape
+    n_words = -(-n_transactions // 64)
+    if n_items == 0:
+        return np.zeros((0, n_words), dtype=np.uint64)
+    
+    # Work from the stored (transaction, item) pairs; never densify
+    coo = binary_data.sparse.to_coo()
+    
+    # Set bit (t % 64) of word (t // 64) in each item's row. OR is
+    # idempotent, so repeated pairs are harmless.
+    transactions = coo.row.astype(np.int64)
+    bitmaps = np.zeros((n_items, n_words), dtype=np.uint64)
+    np.bitwise_or.at(bitmaps,
+                     (coo.col, transactions >> 6),
+                     np.left_shift(np.uint64(1), (transactions & 63).astype(np.uint64)))
+    return bitmaps
+
+def mine_frequent_itemsets(bitmaps, items, n_transactions, min_support, max_len=None):
+    """
+    Mine frequent itemsets level by level on vertical bitmaps (Eclat-style)
+    
+    The support of a candidate is the popcount of the AND of its two parent
+    bitmaps, so no pass over the horizontal basket matrix is needed. All
+    candidates of a level are counted in one batched kernel call.
+    
+    Parameters:
+    -----------
+    bitmaps : numpy.ndarray
+        Transaction-id bitmaps from build_tid_bitmaps
+    items : sequence
+        Item names, one per bitmap row
+    n_transactions : int
+        Number of transactions (baskets)
     min_support : float
         Minimum support threshold
+    max_len : int, optional
+        Maximum itemset length
+    
+    Returns:
+    --------
+    pandas.DataFrame
+        Frequent itemsets with 'support' and 'itemsets' (frozenset) columns
+    """
+    items = np.asarray(items, dtype=object)
+    if n_transactions == 0 or len(items) == 0:
+        return pd.DataFrame({'support': np.array([], dtype=float),
+                             'itemsets': np.array([], dtype=object)})
+    
+    # Level 1: single items
+    supports = popcount_rows(bitmaps) / n_transactions
+    keep = np.flatnonzero(supports >= min_support)
+    level = keep[:, None]
+    level_bitmaps = bitmaps[keep]
+    found_supports = [supports[keep]]
+    found_itemsets = [level]
+    
+    k = 2
+    while len(level) > 1 and (max_len is None or k <= max_len):
+        # Join itemsets sharing their first k-2 items. Levels are kept in
+        # lexicographic order, so each prefix group is a contiguous block
+        # and every member is paired with the members after it.
+        n = len(level)
+        new_group = np.any(level[1:, :-1] != level[:-1, :-1], axis=1)
+        boundaries = np.concatenate(([0], np.flatnonzero(new_group) + 1, [n]))
+        group_end = np.repeat(boundaries[1:], np.diff(boundaries))
+        n_partners = group_end - np.arange(n) - 1
+        rows = np.repeat(np.arange(n), n_partners)
+        offsets = np.repeat(np.cumsum(n_partners) - n_partners, n_partners)
+        cols = rows + 1 + np.arange(len(rows)) - offsets
+    
+        supports = count_supports(level_bitmaps, rows, cols) / n_transactions
+        keep = supports >= min_support
+        rows, cols = rows[keep], cols[keep]
+    
+        level = np.column_stack([level[rows], level[cols, -1]])
+        level_bitmaps = level_bitmaps[rows] & level_bitmaps[cols]
+        found_supports.append(supports[keep])
+        found_itemsets.append(level)
+        k += 1
+    
+    return pd.DataFrame({
+        'support': np.concatenate(found_supports),
+        'itemsets': [frozenset(items[row]) for level in found_itemsets for row in level]
+    })
+
+def generate_rules(frequent_itemsets, min_confidence):
+    """
+    Generate association rules that meet a minimum confidence
+    
+    Only the metrics the app reports are computed: support, confidence and
+    lift. Every non-empty proper subset of a frequent itemset is tried as
+    the antecedent; its support is already known since subsets of frequent
+    itemsets are frequent. Rules are scored one (itemset length, antecedent
+    columns) split at a time over all itemsets of that length, written into
+    preallocated arrays, and turned into a DataFrame once.
+    
+    Parameters:
+    -----------
+    frequent_itemsets : pandas.DataFrame
+        Frequent itemsets with 'support' and 'itemsets' (frozenset) columns
     min_confidence : float
         Minimum confidence threshold
+    
+    Returns:
+    --------
+    pandas.DataFrame
+        Rules with antecedents, consequents, support, confidence and lift
+    """
+    if frequent_itemsets.empty:
+        return pd.DataFrame({
+            'antecedents': np.array([], dtype=object),
+            'consequents': np.array([], dtype=object),
+            'support': np.array([], dtype=float),
+            'confidence': np.array([], dtype=float),
+            'lift': np.array([], dtype=float)
+        })
+    
+    itemsets = frequent_itemsets['itemsets'].to_numpy(dtype=object)
+    supports = frequent_itemsets['support'].to_numpy(dtype=float)
+    lengths = np.fromiter(map(len, itemsets), dtype=np.int64, count=len(itemsets))
+    
+    # Itemsets as sorted item-id rows, packed into one key each (ids shifted
+    # by one so itemsets of different lengths never collide). Keys fall back
+    # to Python ints if they could overflow int64.
+    item_ids = {item: i for i, item in enumerate(sorted(set().union(*itemsets)))}
+    base = len(item_ids) + 1
+    key_dtype = np.int64 if base ** int(lengths.max(initial=0)) < 2 ** 63 else object
+    
+    def pack(rows):
+        keys = np.zeros(len(rows), dtype=key_dtype)
+        for column in rows.astype(key_dtype).T:
+            keys = keys * base + (column + 1)
+        return keys
+    
+    levels = {}
+    keys = np.empty(len(itemsets), dtype=key_dtype)
+    for k in np.unique(lengths):
+        positions = np.flatnonzero(lengths == k)
+        rows = np.array([sorted(item_ids[item] for item in itemsets[p]) for p in positions],
+                        dtype=np.int64).reshape(len(positions), k)
+        keys[positions] = pack(rows)
+        levels[k] = (positions, rows)
+    
+    key_order = np.argsort(keys)
+    sorted_keys = keys[key_order]
+    
+    def lookup(rows):
+        wanted = pack(rows)
+        found = np.minimum(np.searchsorted(sorted_keys, wanted), len(sorted_keys) - 1)
+        if not np.array_equal(sorted_keys[found], wanted):
+            raise ValueError("frequent_itemsets must contain every subset of its itemsets")
+        return key_order[found]
+    
+    # Each k-itemset yields at most 2^k - 2 rules
+    n_upper = int((2 ** lengths - 2).sum())
+    itemset_pos = np.empty(n_upper, dtype=np.int64)
+    antecedent_pos = np.empty(n_upper, dtype=np.int64)
+    consequent_pos = np.empty(n_upper, dtype=np.int64)
+    confidence = np.empty(n_upper, dtype=float)
+    lift = np.empty(n_upper, dtype=float)
+    
+    n_rules = 0
+    for k, (positions, rows) in levels.items():
+        for size in range(k - 1, 0, -1):
+            for columns in combinations(range(k), size):
+                rest = [c for c in range(k) if c not in columns]
+                antecedents = lookup(rows[:, columns])
+                consequents = lookup(rows[:, rest])
+    
+                rule_confidence = supports[positions] / supports[antecedents]
+                keep = rule_confidence >= min_confidence
+                end = n_rules + int(keep.sum())
+    
+                itemset_pos[n_rules:end] = positions[keep]
+                antecedent_pos[n_rules:end] = antecedents[keep]
+                consequent_pos[n_rules:end] = consequents[keep]
+                confidence[n_rules:end] = rule_confidence[keep]
+                lift[n_rules:end] = rule_confidence[keep] / supports[consequents[keep]]
+                n_rules = end
+    
+    # Group rules by their itemset, in frequent-itemset order
+    order = np.argsort(itemset_pos[:n_rules], kind='stable')
+    
+    return pd.DataFrame({
+        'antecedents': itemsets[antecedent_pos[order]],
+        'consequents': itemsets[consequent_pos[order]],
+        'support': supports[itemset_pos[order]],
+        'confidence': confidence[order],
+        'lift': lift[order]
+    })
+
+# Most recent prepare_transactions results, keyed by a content fingerprint.
+# Shared by all Streamlit session threads, so every access holds the lock.
+_PREPARED_CACHE = OrderedDict()
+_PREPARED_CACHE_SIZE = 4
+_PREPARED_CACHE_LOCK = threading.Lock()
+
+def _fingerprint(data):
+    """
+    Cheap content hash of a transactions frame
+    """
+    row_hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    return (len(data), tuple(data.columns), int(row_hashes.sum()))
+
+def _copy_prepared(binary_data, bitmaps, stats):
+    """
+    Hand out a cached entry without letting callers modify the shared copy
+    """
+    stats = {name: value.copy() if isinstance(value, pd.Series) else value
+             for name, value in stats.items()}
+    return binary_data.copy(), bitmaps, stats
+
+def prepare_transactions(data):
+    """
+    Run the data-dependent steps shared by every threshold setting
+    
+    Results for the last few distinct inputs are cached, so sweeping the
+    thresholds over the same data skips preprocessing entirely.
+    
+    Parameters:
+    -----------
+    data : pandas.DataFrame
+        Transaction data where each row represents a transaction
         
     Returns:
     --------
     tuple
-        (frequent_itemsets, rules, binary_data, stats)
+        (binary_data, bitmaps, stats)
     """
+    key = _fingerprint(data)
+    with _PREPARED_CACHE_LOCK:
+        cached = _PREPARED_CACHE.get(key)
+        if cached is not None:
+            _PREPARED_CACHE.move_to_end(key)
+    if cached is not None:
+        return _copy_prepared(*cached)
+    
     # Preprocess data
     data = preprocess_data(data)
     
@@ -80,26 +400,161 @@ def run_apriori(data, min_support, min_confidence):
     stats = analyze_transactions(data)
     
     # Create binary matrix with boolean type
-    binary_data = pd.crosstab(data['Member_number'], data['itemDescription'])
-    binary_data = binary_data.astype(bool)  # Convert to boolean type
+    binary_data = build_basket_matrix(data)
+    
+    # Vertical transaction-id bitmaps used for support counting
+    bitmaps = build_tid_bitmaps(binary_data)
+    
+    # Shared read-only by every cache hit
+    bitmaps.flags.writeable = False
+    
+    # Another thread may have prepared the same data meanwhile; keep one entry
+    with _PREPARED_CACHE_LOCK:
+        cached = _PREPARED_CACHE.setdefault(key, (binary_data, bitmaps, stats))
+        _PREPARED_CACHE.move_to_end(key)
+        if len(_PREPARED_CACHE) > _PREPARED_CACHE_SIZE:
+            _PREPARED_CACHE.popitem(last=False)
     
-    # Generate frequent itemsets
-    frequent_itemsets = apriori(binary_data, 
-                              min_support=min_support,
-                              use_colnames=True)
+    return _copy_prepared(*cached)
+
+def mine_rules(bitmaps, items, n_transactions, min_support, min_confidence, max_len=None):
+    """
+    Mine frequent itemsets and association rules for one threshold setting
+    
+    Parameters:
+    -----------
+    bitmaps : numpy.ndarray
+        Transaction-id bitmaps from build_tid_bitmaps
+    items : sequence
+        Item names, one per bitmap row
+    n_transactions : int
+        Number of transactions (baskets)
+    min_support : float
+        Minimum support threshold
+    min_confidence : float
+        Minimum confidence threshold
+    max_len : int, optional
+        Maximum itemset length
+        
+    Returns:
+    --------
+    tuple
+        (frequent_itemsets, rules)
+    """
+    # Generate frequent itemsets from vertical transaction-id bitmaps
+    frequent_itemsets = mine_frequent_itemsets(bitmaps,
+                                               items,
+                                               n_transactions,
+                                               min_support,
+                                               max_len=max_len)
     
-    # Generate association rules with additional metrics
-    rules = association_rules(frequent_itemsets, 
-                            metric="confidence",
-                            min_threshold=min_confidence)
+    # Generate association rules above the confidence threshold
+    rules = generate_rules(frequent_itemsets, min_confidence)
     
-    # Add additional metrics if rules exist
+    # Round the reported metrics in one block and sort rules by lift
     if not rules.empty:
-        rules['lift'] = rules['lift'].round(3)
-        rules['confidence'] = rules['confidence'].round(3)
-        rules['support'] = rules['support'].round(3)
+        metrics = ['support', 'confidence', 'lift']
+        values = np.round(rules[metrics].to_numpy(dtype=float), 3)
+        rules[metrics] = values
+        
+        # Stable, so rules with equal lift keep their generation order
+        rules = rules.iloc[np.argsort(-values[:, 2], kind='stable')]
+    
+    # Display-ready itemset strings, sorted so the output is deterministic
+    rules['antecedents_str'] = pd.Series([', '.join(sorted(s)) for s in rules['antecedents']],
+                                         index=rules.index, dtype=str)
+    rules['consequents_str'] = pd.Series([', '.join(sorted(s)) for s in rules['consequents']],
+                                         index=rules.index, dtype=str)
+    
+    return frequent_itemsets, rules
+
+def run_apriori(data, min_support, min_confidence, max_len=None):
+    """
+    Run Apriori algorithm on the transaction data
+    
+    Parameters:
+    -----------
+    data : pandas.DataFrame
+        Transaction data where each row represents a transaction
+    min_support : float
+        Minimum support threshold
+    min_confidence : float
+        Minimum confidence threshold
+    max_len : int, optional
+        Maximum itemset length; set it to bound rule explosion at low support
+        
+    Returns:
+    --------
+    tuple
+        (frequent_itemsets, rules, binary_data, stats)
+    """
+    binary_data, bitmaps, stats = prepare_transactions(data)
+    
+    frequent_itemsets, rules = mine_rules(bitmaps,
+                                          binary_data.columns,
+                                          binary_data.shape[0],
+                                          min_support,
+                                          min_confidence,
+                                          max_len=max_len)
+    
+    return frequent_itemsets, rules, binary_data, stats
+
+# Bitmaps and item names handed to each batch worker once, at start-up
+_worker_state = {}
+
+def _init_batch_worker(bitmaps, items, n_transactions, max_len):
+    _worker_state.update(bitmaps=bitmaps, items=items,
+                         n_transactions=n_transactions, max_len=max_len)
+
+def _mine_in_worker(min_support, min_confidence):
+    return mine_rules(_worker_state['bitmaps'],
+                      _worker_state['items'],
+                      _worker_state['n_transactions'],
+                      min_support,
+                      min_confidence,
+                      max_len=_worker_state['max_len'])
+
+def run_apriori_batch(data, settings, max_len=None, max_workers=None):
+    """
+    Run the analysis for several (min_support, min_confidence) settings
+    
+    The data is preprocessed and turned into bitmaps once; each setting is
+    then mined in its own worker process.
+    
+    Parameters:
+    -----------
+    data : pandas.DataFrame
+        Transaction data where each row represents a transaction
+    settings : iterable of tuple
+        (min_support, min_confidence) pairs to evaluate
+    max_len : int, optional
+        Maximum itemset length
+    max_workers : int, optional
+        Number of worker processes (defaults to the CPU count)
         
-        # Sort rules by lift
-        rules = rules.sort_values('lift', ascending=False)
+    Returns:
+    --------
+    tuple
+        (results, binary_data, stats) where results holds a
+        (frequent_itemsets, rules) pair per setting, in input order
+    """
+    settings = list(settings)
+    binary_data, bitmaps, stats = prepare_transactions(data)
+    items = np.asarray(binary_data.columns, dtype=object)
+    n_transactions = binary_data.shape[0]
+    
+    if len(settings) <= 1 or max_workers == 1:
+        results = [mine_rules(bitmaps, items, n_transactions, min_support, min_confidence, max_len=max_len)
+                   for min_support, min_confidence in settings]
+        return results, binary_data, stats
+    
+    # The bitmaps are small (items x baskets / 8 bytes), so they are simply
+    # pickled to each worker once through the pool initializer
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_batch_worker,
+                             initargs=(bitmaps, items, n_transactions, max_len)) as executor:
+        futures = [executor.submit(_mine_in_worker, min_support, min_confidence)
+                   for min_support, min_confidence in settings]
+        results = [future.result() for future in futures]
     
-    return frequent_itemsets, rules, binary_data, stats 
\ No newline at end of file
+    return results, binary_data, stats
@@ -0,0 +1,8 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# The app modules import each other as top-level modules (Streamlit runs
+# app/app.py with app/ on the path), so mirror that here
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
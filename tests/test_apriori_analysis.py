@@ -0,0 +1,169 @@
+# tests/test_apriori_analysis.py
+
+import os
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from apriori_analysis import (
+    generate_rules,
+    mine_frequent_itemsets,
+    prepare_transactions,
+    preprocess_data,
+    run_apriori,
+    run_apriori_batch,
+)
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_transactions.csv')
+
+
+def load_sample():
+    return pd.read_csv(SAMPLE_CSV)
+
+
+def sample_baskets():
+    data = preprocess_data(load_sample())
+    return [frozenset(items) for _, items in data.groupby('Member_number')['itemDescription']]
+
+
+def brute_force_itemsets(baskets, min_support, max_len=None):
+    """
+    Support of every itemset contained in any basket, kept if frequent
+    """
+    counts = Counter()
+    for basket in baskets:
+        for size in range(1, min(len(basket), max_len or len(basket)) + 1):
+            counts.update(frozenset(c) for c in combinations(sorted(basket), size))
+    return {itemset: count / len(baskets) for itemset, count in counts.items()
+            if count / len(baskets) >= min_support}
+
+
+def brute_force_rules(supports, min_confidence):
+    """
+    Every antecedent -> consequent split of every frequent itemset
+    """
+    rules = {}
+    for itemset, support in supports.items():
+        for size in range(1, len(itemset)):
+            for antecedent in map(frozenset, combinations(sorted(itemset), size)):
+                consequent = itemset - antecedent
+                confidence = support / supports[antecedent]
+                if confidence >= min_confidence:
+                    rules[antecedent, consequent] = (support, confidence,
+                                                     confidence / supports[consequent])
+    return rules
+
+
+def as_support_dict(frequent_itemsets):
+    return dict(zip(frequent_itemsets['itemsets'], frequent_itemsets['support']))
+
+
+def as_rule_dict(rules):
+    return {(a, c): (s, conf, lift) for a, c, s, conf, lift in
+            zip(rules['antecedents'], rules['consequents'],
+                rules['support'], rules['confidence'], rules['lift'])}
+
+
+def mine_sample(min_support, max_len=None):
+    binary_data, bitmaps, _ = prepare_transactions(load_sample())
+    return mine_frequent_itemsets(bitmaps, binary_data.columns, binary_data.shape[0],
+                                  min_support, max_len=max_len)
+
+
+@pytest.mark.parametrize('max_len', [None, 2])
+@pytest.mark.parametrize('min_support', [0.05, 0.1, 0.3, 0.6])
+def test_frequent_itemsets_match_brute_force(min_support, max_len):
+    expected = brute_force_itemsets(sample_baskets(), min_support, max_len)
+    found = mine_sample(min_support, max_len)
+
+    assert len(found) == len(expected)
+    assert as_support_dict(found) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('min_confidence', [0.0, 0.5, 0.9])
+@pytest.mark.parametrize('min_support', [0.05, 0.2])
+def test_rules_match_brute_force(min_support, min_confidence):
+    frequent_itemsets = mine_sample(min_support)
+    expected = brute_force_rules(as_support_dict(frequent_itemsets), min_confidence)
+    rules = generate_rules(frequent_itemsets, min_confidence)
+
+    assert len(rules) == len(expected)
+    found = as_rule_dict(rules)
+    assert found.keys() == expected.keys()
+    for key, metrics in expected.items():
+        assert found[key] == pytest.approx(metrics)
+
+
+def test_run_apriori_rounds_and_sorts_rules():
+    frequent_itemsets, rules, binary_data, stats = run_apriori(load_sample(), 0.1, 0.5)
+    expected = brute_force_rules(brute_force_itemsets(sample_baskets(), 0.1), 0.5)
+
+    assert len(rules) == len(expected) > 0
+    assert list(rules['lift']) == sorted(rules['lift'], reverse=True)
+    for (antecedent, consequent), metrics in expected.items():
+        row = rules[(rules['antecedents'] == antecedent) & (rules['consequents'] == consequent)]
+        assert row[['support', 'confidence', 'lift']].iloc[0].tolist() == list(np.round(metrics, 3))
+        assert row['antecedents_str'].iloc[0] == ', '.join(sorted(antecedent))
+    assert stats['total_transactions'] == binary_data.shape[0]
+
+
+def test_rules_with_keys_beyond_int64():
+    # 3000 items and a 6-itemset: (3000 + 1) ** 6 overflows int64, so the
+    # packed subset keys fall back to Python ints
+    names = ['item%04d' % i for i in range(3000)]
+    itemsets = [frozenset([name]) for name in names]
+    itemsets += [frozenset(c) for size in range(2, 7) for c in combinations(names[100:106], size)]
+    rng = np.random.default_rng(0)
+    frequent_itemsets = pd.DataFrame({
+        'support': [1 / len(s) + rng.random() * 0.01 for s in itemsets],
+        'itemsets': itemsets
+    })
+
+    expected = brute_force_rules(as_support_dict(frequent_itemsets), 0.3)
+    found = as_rule_dict(generate_rules(frequent_itemsets, 0.3))
+
+    assert found.keys() == expected.keys()
+    for key, metrics in expected.items():
+        assert found[key] == pytest.approx(metrics)
+
+
+def test_rules_reject_itemsets_missing_a_subset():
+    frequent_itemsets = pd.DataFrame({
+        'support': [0.5, 0.4, 0.3],
+        'itemsets': [frozenset(['a']), frozenset(['c']), frozenset(['a', 'b'])]
+    })
+    with pytest.raises(ValueError):
+        generate_rules(frequent_itemsets, 0.1)
+
+
+def test_empty_input_returns_empty_results():
+    empty = load_sample().iloc[:0]
+    frequent_itemsets, rules, binary_data, stats = run_apriori(empty, 0.1, 0.5)
+
+    assert frequent_itemsets.empty
+    assert list(frequent_itemsets.columns) == ['support', 'itemsets']
+    assert rules.empty
+    assert {'antecedents', 'consequents', 'support', 'confidence', 'lift'} <= set(rules.columns)
+    assert stats['total_transactions'] == 0
+    assert stats['most_common_items'].empty
+
+
+@pytest.mark.parametrize('min_support, min_confidence', [(0.99, 0.5), (0.05, 1.01)])
+def test_no_rules(min_support, min_confidence):
+    frequent_itemsets, rules, _, _ = run_apriori(load_sample(), min_support, min_confidence)
+
+    assert rules.empty
+    assert rules['support'].dtype == float
+    assert len(frequent_itemsets) == len(brute_force_itemsets(sample_baskets(), min_support))
+
+
+def test_batch_matches_single_runs():
+    settings = [(0.1, 0.5), (0.2, 0.3)]
+    results, _, _ = run_apriori_batch(load_sample(), settings, max_workers=2)
+
+    for (min_support, min_confidence), (frequent_itemsets, rules) in zip(settings, results):
+        _, single_rules, _, _ = run_apriori(load_sample(), min_support, min_confidence)
+        assert as_rule_dict(rules) == as_rule_dict(single_rules)